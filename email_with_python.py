@@ -24,19 +24,35 @@ Author: Muddassir Khalidi
 Date: 15 January 2024
 """
 
+import concurrent.futures
+import csv
+import itertools
+import os
 import smtplib
 import getpass
+import queue
 import re
 import sys
+import time
+from email.message import EmailMessage
+
+# Compiled once at import so validation never pays for a regex cache
+# lookup or recompilation, no matter how often it is called. The
+# fixed character classes cannot backtrack, so pathological input
+# fails fast instead of triggering ReDoS-style blowups.
+_EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
 
 class EmailSender:
     """
     A class for handling email sending functionality using SMTP.
 
     Attributes:
-        smtp_object (smtplib.SMTP): An SMTP connection object.
+        smtp_object (smtplib.SMTP): An SMTP connection object, opened
+            lazily on the first login or send.
     """
 
+    __slots__ = ('smtp_server', 'smtp_port', 'smtp_object', '_email', '_password')
+
     def __init__(self, smtp_server='smtp.gmail.com', smtp_port=587):
         """
         Initializes the EmailSender object.
@@ -45,13 +61,22 @@ class EmailSender:
             smtp_server (str): SMTP server address.
             smtp_port (int): SMTP server port.
         """
-        self.smtp_object = smtplib.SMTP(smtp_server, smtp_port)
-        self.smtp_object.ehlo()
-        self.smtp_object.starttls()
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self._email = None
+        self._password = None
+        self.smtp_object = None
+
+    def _connect(self):
+        """Open the SMTP connection if it is not already open."""
+        if self.smtp_object is None:
+            self.smtp_object = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            self.smtp_object.ehlo()
+            self.smtp_object.starttls()
 
     def login(self):
         """
-        Log in to the SMTP server.
+        Log in to the SMTP server, connecting on first use.
 
         Returns:
             str: The email address used for login.
@@ -60,23 +85,162 @@ class EmailSender:
             try:
                 email = get_email()
                 password = getpass.getpass('Enter your password: ')
+                self._connect()
                 self.smtp_object.login(email, password)
             except smtplib.SMTPAuthenticationError:
                 print('Invalid combination of email and password!')
             else:
+                self._email = email
+                self._password = password
                 return email
 
+    def send(self, from_addr, to_addr, msg):
+        """
+        Send one message, reconnecting once if the server has
+        dropped the connection since the last send.
+        """
+        self._connect()
+        try:
+            return self.smtp_object.sendmail(from_addr, to_addr, msg)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+            self._reconnect()
+            return self.smtp_object.sendmail(from_addr, to_addr, msg)
+
+    def send_message(self, msg):
+        """
+        Send a prebuilt email.message.EmailMessage, reconnecting once
+        if the server has dropped the connection since the last send.
+        """
+        self._connect()
+        try:
+            return self.smtp_object.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+            self._reconnect()
+            return self.smtp_object.send_message(msg)
+
+    def _reconnect(self):
+        """Rebuild the SMTP connection and log back in with the saved credentials."""
+        if self.smtp_object is not None:
+            try:
+                self.smtp_object.close()
+            except OSError:
+                pass
+            self.smtp_object = None
+        self._connect()
+        if self._email is not None:
+            self.smtp_object.login(self._email, self._password)
+
     def close_connection(self):
-        """Close the SMTP connection."""
-        self.smtp_object.quit() 
+        """Close the SMTP connection if one is open."""
+        if self.smtp_object is not None:
+            self.smtp_object.quit()
+            self.smtp_object = None
+
+
+class SMTPPool:
+    """
+    A pool of logged-in SMTP connections for large batch sends.
+
+    Providers such as Gmail cap how many messages one connection may
+    carry and how fast they may arrive, so each connection keeps a
+    message counter and is replaced with a fresh one after
+    'max_messages' sends. 'rate_delta_ms' adds an optional pause after
+    every send to stay under per-minute quotas.
+
+    Attributes:
+        size (int): Number of parallel SMTP connections.
+        max_messages (int): Messages per connection before it is recycled.
+        rate_delta (float): Pause in seconds applied after each send.
+    """
+
+    def __init__(self, admin, size=5, max_messages=100, rate_delta_ms=0):
+        """
+        Builds the pool by cloning the already-logged-in 'admin' sender.
+
+        Args:
+            admin (EmailSender): A logged-in sender whose server and
+                credentials the pooled connections reuse.
+            size (int): Number of connections to open.
+            max_messages (int): Messages per connection before recycling.
+            rate_delta_ms (int): Delay in milliseconds between sends.
+        """
+        self.admin = admin
+        self.size = size
+        self.max_messages = max_messages
+        self.rate_delta = rate_delta_ms / 1000
+        self._connections = queue.Queue()
+        for _ in range(size):
+            self._connections.put((self._open_connection(), 0))
+
+    def _open_connection(self):
+        """Open a fresh connection logged in with the admin's credentials."""
+        sender = EmailSender(self.admin.smtp_server, self.admin.smtp_port)
+        sender._email = self.admin._email
+        sender._password = self.admin._password
+        sender._reconnect()
+        return sender
+
+    def acquire(self):
+        """
+        Check a connection out of the pool, blocking until one is free.
+
+        Returns:
+            tuple: An (EmailSender, sent_count) pair; pass both back
+            to release() when done.
+        """
+        return self._connections.get()
+
+    def release(self, sender, sent_count):
+        """
+        Return a connection to the pool, recycling it once it has
+        carried 'max_messages' messages.
+        """
+        if sent_count >= self.max_messages:
+            try:
+                sender.close_connection()
+            except (smtplib.SMTPException, OSError):
+                pass
+            sender = self._open_connection()
+            sent_count = 0
+        self._connections.put((sender, sent_count))
+
+    def send(self, from_addr, to_addr, msg):
+        """Send one message on a pooled connection, pacing if configured."""
+        sender, sent_count = self.acquire()
+        try:
+            sender.send(from_addr, to_addr, msg)
+            sent_count += 1
+        finally:
+            self.release(sender, sent_count)
+        if self.rate_delta:
+            time.sleep(self.rate_delta)
+
+    def send_message(self, msg):
+        """Send a prebuilt message on a pooled connection, pacing if configured."""
+        sender, sent_count = self.acquire()
+        try:
+            sender.send_message(msg)
+            sent_count += 1
+        finally:
+            self.release(sender, sent_count)
+        if self.rate_delta:
+            time.sleep(self.rate_delta)
+
+    def close(self):
+        """Close every connection in the pool."""
+        while not self._connections.empty():
+            sender, _ = self._connections.get()
+            try:
+                sender.close_connection()
+            except (smtplib.SMTPException, OSError):
+                pass
+
 
 def is_valid_email(email):
     """
     Validate the format of the email using regular expressions.
     """
-    # Regular expression pattern for validating email
-    pattern = r'^\w+@[a-zA-Z]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email)
+    return _EMAIL_RE.fullmatch(email)
 
 def send_to_one_user(admin, admin_email, email: str):
     """
@@ -85,7 +249,7 @@ def send_to_one_user(admin, admin_email, email: str):
     subject = get_subject()
     content = get_content_for_one_user()
     message = f'Subject: {subject} \n{content}'
-    admin.smtp_object.sendmail(admin_email, email, message)
+    admin.send(admin_email, email, message)
     print('Email sent!')
 
 
@@ -136,34 +300,248 @@ Follow these instructions to create personalized email messages using the provid
     # Combine the lines into a single message
     message = '\n'.join(message_lines)
 
+    # Rewrite the named placeholders as positional ones once, so each
+    # row formats with message.format(*items) instead of rebuilding a
+    # kwargs dict per recipient.
+    template = message.replace('{name}', '{0}')
+    for i in range(len(custom_lists)):
+        template = template.replace(f'{{custom{i + 1}}}', f'{{{i + 1}}}')
+
     messages = []
     try:
         for items in zip(name_list, *custom_lists):
-            # Format the message template with the current items
-            name = items[0]
-            custom_items = {f'custom{i+1}': item for i, item in enumerate(items[1:])}
-
-            formatted_message = message.format(name=name, **custom_items)
-            messages.append(formatted_message)
+            messages.append(template.format(*items))
 
     except KeyError as error:
         print(f"Error: Placeholder {error} is missing from the message template.")
     subject = get_subject()
+    subject_header = f'Subject: {subject} \n'
+    send = admin.send
     for email, message in zip(email_list, messages):
-        final_message = f'Subject: {subject} \n{message}'
-        admin.smtp_object.sendmail(admin_email, email, final_message)
+        final_message = subject_header + message
+        send(admin_email, email, final_message)
         print('Email sent!')
         
+# Files larger than this are parsed with pandas when it is installed;
+# its C reader splits fields far faster than the stdlib csv module.
+_FAST_PARSE_THRESHOLD = 1_000_000
+
+def _read_message_body(prompt):
+    """
+    Reads a message body terminated by a blank line (or EOF).
+
+    Interactive sessions keep the friendly prompt-per-line behaviour.
+    Piped input skips input() entirely and drains sys.stdin.readline
+    directly, avoiding a prompt flush and prompt state per line.
+    """
+    if not sys.stdin.isatty():
+        lines = iter(sys.stdin.readline, '\n')
+        return ''.join(itertools.takewhile(bool, lines))
+    lines = [input(prompt)]
+    for line in iter(input, ''):
+        lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+def _open_csv(file_name):
+    """
+    Opens the CSV file and reads only its header.
+
+    Files above _FAST_PARSE_THRESHOLD bytes are parsed with pandas'
+    C-accelerated reader in 100k-row chunks when pandas is installed;
+    everything else goes through the stdlib csv module. Either way the
+    rows come back as a generator, not a list.
+
+    Returns:
+        tuple: The header row and a generator over the remaining rows.
+        The file is closed once the generator is exhausted, so the rows
+        are streamed instead of being held in memory all at once.
+    """
+    if os.path.getsize(file_name) > _FAST_PARSE_THRESHOLD:
+        try:
+            import pandas as pd
+        except ImportError:
+            pass
+        else:
+            # keep_default_na=False so blank cells come back as ''
+            # like the csv path, not float nan.
+            chunks = pd.read_csv(file_name, dtype=str, chunksize=100_000,
+                                 keep_default_na=False)
+            first = next(chunks)
+
+            def fast_rows():
+                yield from first.itertuples(index=False, name=None)
+                for chunk in chunks:
+                    yield from chunk.itertuples(index=False, name=None)
+
+            return list(first.columns), fast_rows()
+
+    csv_file = open(file_name, newline='', encoding='utf-8')
+    reader = csv.reader(csv_file)
+    header = next(reader)
+
+    def rows():
+        with csv_file:
+            for row in reader:
+                yield row
+
+    return header, rows()
+
+# Headers wider than this are normalized with NumPy when it is
+# installed, replacing per-cell lower/strip calls with two array ops.
+_WIDE_HEADER_THRESHOLD = 100
+
+def _index_header(header):
+    """
+    Maps each normalized header cell to its column index so column
+    lookups become O(1) dict probes instead of scans.
+    """
+    if len(header) > _WIDE_HEADER_THRESHOLD:
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+        else:
+            normalized = np.char.lower(np.char.strip(np.array(header, dtype=str)))
+            return {cell: index for index, cell in enumerate(normalized)}
+    return {cell.strip().lower(): index for index, cell in enumerate(header)}
+
+def _locate_columns(header):
+    """
+    Finds the name and email columns in a single pass over the header.
+
+    Returns:
+        tuple: (name_column, email_column) indices; either is None
+        when the header has no matching column.
+    """
+    header_index = _index_header(header)
+    name_column = next((header_index[key] for key in
+                        ('name', 'names')
+                        if key in header_index), None)
+    email_column = next((header_index[key] for key in
+                         ('email', 'emails', 'email address', 'email addresses')
+                         if key in header_index), None)
+    return name_column, email_column
+
+def _get_mailing_list(file_name):
+    """
+    Streams the mailing list out of the CSV file row by row.
+
+    Duplicate addresses are skipped (the first occurrence wins) so a
+    batch never pays the network round-trip twice for one recipient.
+
+    Returns:
+        tuple: (has_names, generator) - the generator yields
+        (name, email) pairs when the file has a name column and bare
+        email addresses otherwise.
+    """
+    header, rows = _open_csv(file_name)
+    name_column, email_column = _locate_columns(header)
+    if email_column is None:
+        raise ValueError('No email column found in the file.')
+
+    def unique_rows():
+        seen = set()
+        duplicates = 0
+        for row in rows:
+            email = row[email_column]
+            if email in seen:
+                duplicates += 1
+                continue
+            seen.add(email)
+            yield row
+        if duplicates:
+            print(f'Skipped {duplicates} duplicate address(es)')
+
+    if name_column is None:
+        return False, (row[email_column] for row in unique_rows())
+    return True, ((row[name_column], row[email_column]) for row in unique_rows())
+
+def _send_email_with_name(admin, admin_email, mailing_list, pool_size=5):
+    """
+    Sends a personalized email to every (name, email) pair in the
+    mailing list.
+
+    The messages differ per recipient, so they cannot share one DATA
+    transaction; instead they go out over a pool of 'pool_size' SMTP
+    connections driven by as many threads, overlapping the network
+    round-trips that otherwise queue up on a single socket.
+    """
+    subject = get_subject()
+    content = _read_message_body('Enter your message (Press Enter twice to finish): ')
+    body_prefix = 'Dear '
+    body_suffix = f' \n{content}'
+    pool = SMTPPool(admin, size=pool_size)
+    send = pool.send_message
+
+    def send_one(item):
+        # Each worker builds its own message: EmailMessage header
+        # mutation is not thread-safe across the pooled sends.
+        name, receiver_email = item
+        msg = EmailMessage()
+        msg['Subject'] = subject
+        msg['From'] = admin_email
+        msg['To'] = receiver_email
+        msg.set_content(body_prefix + name + body_suffix)
+        send(msg)
+        print('Email sent!')
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=pool.size) as executor:
+            list(executor.map(send_one, mailing_list))
+    finally:
+        pool.close()
+
+def _send_email_without_name(admin, admin_email, mailing_list, batch_size=50):
+    """
+    Sends the same email to every address in the mailing list.
+
+    Since the message is identical for everyone, addresses are sent in
+    batches of 'batch_size' per sendmail call, so one DATA transaction
+    covers the whole batch instead of one round-trip per recipient.
+    Addresses the server refuses are retried individually.
+    """
+    subject = get_subject()
+    content = _read_message_body('Enter your message (Press Enter twice to finish): ')
+    message = f'Subject: {subject} \n{content}'
+    send = admin.send
+    rows = iter(mailing_list)
+    for batch in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+        try:
+            refused = send(admin_email, batch, message)
+        except smtplib.SMTPRecipientsRefused as error:
+            refused = error.recipients
+        delivered = len(batch) - len(refused)
+        for receiver_email in refused:
+            try:
+                send(admin_email, receiver_email, message)
+            except smtplib.SMTPRecipientsRefused:
+                print(f'Could not deliver to {receiver_email}')
+            else:
+                delivered += 1
+        print(f'Email sent to {delivered} of {len(batch)} recipients!')
+
+def send_email_to_group(admin, admin_email, file_name):
+    """
+    Sends an email to everyone listed in the CSV file, addressing
+    recipients by name when the file has a name column.
+    """
+    has_names, mailing_list = _get_mailing_list(file_name)
+    if has_names:
+        _send_email_with_name(admin, admin_email, mailing_list)
+    else:
+        _send_email_without_name(admin, admin_email, mailing_list)
+
 def get_email():
     """
     Gets the email of the user, validates it and returns it
     """
+    fullmatch = _EMAIL_RE.fullmatch
     email = input('Enter email: ')
-    while not is_valid_email(email):
+    while not fullmatch(email):
         print('Enter a valid email')
         print('-'*50)
         email = input('Enter email')
-    
+
     return email
 
 def get_subject():
@@ -177,15 +555,7 @@ def get_content_for_one_user():
     """
     Returns the content of the email
     """
-    content = input('Enter message: ') + '\n'
-    while True:
-        line = input()
-        if not line:
-            break
-        line += '\n'
-        content += line
-    
-    return content
+    return _read_message_body('Enter message: ')
 
 
 if __name__ == '__main__':
@@ -199,11 +569,8 @@ if __name__ == '__main__':
         if email_type == '1':
             send_to_one_user(admin, admin_email, 'muddassirnawazkhan@gmail.com')
         else:
-            names = ['Muddassir', 'Andre Stephens']
-            emails = ['muddassirnawazkhan@gmail.com', 'andrestephens2604@gmail.com']
-            penalties = [100, 200]
-            released = ['Released','Not Released']
-            send_to_group(admin, admin_email, names, emails, penalties, released)
+            file_name = input('Enter the path to your CSV file: ')
+            send_email_to_group(admin, admin_email, file_name)
         choice = input('Do you want to send another email? [y/n]: ').lower().strip()
         while choice not in ['y', 'n']:
             choice = input('Enter a valid choice [y/n]: ')